@@ -3,6 +3,40 @@ import sqlite3
 import datetime
 from datetime import date, timedelta
 import getpass
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+def month_bounds(year, month):
+    """Первый и последний день месяца"""
+    start_date = date(year, month, 1)
+    if month == 12:
+        end_date = date(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        end_date = date(year, month + 1, 1) - timedelta(days=1)
+    return start_date, end_date
+
+def fetch_monthly_stats(conn, start_date, end_date):
+    """Статистика по сотрудникам за период (на уже открытом соединении)"""
+    cursor = conn.cursor()
+    
+    cursor.execute('''
+        SELECT e.full_name, 
+               COUNT(a.id) as work_days,
+               SUM(a.hours_worked) as total_hours,
+               AVG(a.hours_worked) as avg_hours
+        FROM employees e
+        LEFT JOIN attendance a ON e.id = a.employee_id 
+            AND a.work_date BETWEEN ? AND ? AND a.status = 'Present'
+        WHERE e.is_admin = 0
+        GROUP BY e.id, e.full_name
+        ORDER BY total_hours DESC
+    ''', (start_date, end_date))
+    
+    stats = cursor.fetchall()
+    cursor.close()
+    return stats
 
 class AdminAttendanceSystem:
     def __init__(self, db_name='attendance.db'):
@@ -170,30 +204,10 @@ class AdminAttendanceSystem:
         if not month:
             month = date.today().month
         
-        start_date = date(year, month, 1)
-        if month == 12:
-            end_date = date(year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = date(year, month + 1, 1) - timedelta(days=1)
+        start_date, end_date = month_bounds(year, month)
         
         conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        # Статистика по сотрудникам
-        cursor.execute('''
-            SELECT e.full_name, 
-                   COUNT(a.id) as work_days,
-                   SUM(a.hours_worked) as total_hours,
-                   AVG(a.hours_worked) as avg_hours
-            FROM employees e
-            LEFT JOIN attendance a ON e.id = a.employee_id 
-                AND a.work_date BETWEEN ? AND ? AND a.status = 'Present'
-            WHERE e.is_admin = 0
-            GROUP BY e.id, e.full_name
-            ORDER BY total_hours DESC
-        ''', (start_date, end_date))
-        
-        stats = cursor.fetchall()
+        stats = fetch_monthly_stats(conn, start_date, end_date)
         conn.close()
         
         print(f"\n📈 СТАТИСТИКА ЗА {month:02d}.{year}")
@@ -317,6 +331,197 @@ class AdminAttendanceSystem:
             else:
                 print("❌ Неверный выбор!")
 
+class BranchRouter:
+    """Маршрутизатор филиалов: много баз attendance.db в одном процессе.
+    
+    Держит не больше max_open открытых соединений; при нехватке закрывается
+    давно не использованное свободное соединение (LRU). Вытесненное
+    соединение закрывается до открытия нового, поэтому если новый файл
+    открыть не удалось, в пуле остается на одно соединение меньше.
+    """
+    def __init__(self, branches=None, max_open=16, max_workers=None):
+        if max_open < 1:
+            raise ValueError("max_open должен быть не меньше 1")
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers должен быть не меньше 1")
+        
+        self.branches = dict(branches or {})
+        self.max_open = max_open
+        self.max_workers = max_workers or max_open
+        self._pool = OrderedDict()
+        self._busy = set()
+        self._pending = 0
+        self._cond = threading.Condition()
+    
+    def add_branch(self, branch, db_name):
+        """Регистрация базы филиала (или смена ее файла)"""
+        with self._cond:
+            while branch in self._busy:
+                self._cond.wait()
+            
+            # Старое соединение читало бы прежний файл
+            if self.branches.get(branch) != db_name and branch in self._pool:
+                self._pool.pop(branch).close()
+            self.branches[branch] = db_name
+            self._cond.notify_all()
+    
+    def _open(self, db_name):
+        """Открытие базы филиала только для чтения"""
+        uri = Path(db_name).resolve().as_uri() + '?mode=ro'
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+    
+    def _acquire(self, branch):
+        """Получение соединения филиала из пула"""
+        with self._cond:
+            if branch not in self.branches:
+                raise KeyError(branch)
+            
+            while True:
+                # Соединение филиала занято или еще открывается
+                if branch in self._busy:
+                    self._cond.wait()
+                    continue
+                
+                if branch in self._pool:
+                    self._pool.move_to_end(branch)
+                    self._busy.add(branch)
+                    return self._pool[branch]
+                
+                victim = None
+                if len(self._pool) + self._pending < self.max_open:
+                    break
+                
+                # Слот освободит самое старое свободное соединение
+                victim = next((b for b in self._pool if b not in self._busy), None)
+                if victim is not None:
+                    victim_conn = self._pool.pop(victim)
+                    break
+                
+                self._cond.wait()
+            
+            # Резервируем слот и открываем файл уже без блокировки
+            self._pending += 1
+            self._busy.add(branch)
+            db_name = self.branches[branch]
+        
+        if victim is not None:
+            victim_conn.close()
+        
+        try:
+            conn = self._open(db_name)
+        except Exception:
+            with self._cond:
+                self._pending -= 1
+                self._busy.discard(branch)
+                self._cond.notify_all()
+            raise
+        
+        with self._cond:
+            self._pending -= 1
+            self._pool[branch] = conn
+            self._cond.notify_all()
+        return conn
+    
+    def _release(self, branch):
+        """Возврат соединения в пул"""
+        with self._cond:
+            self._busy.discard(branch)
+            self._cond.notify_all()
+    
+    def open_connections(self):
+        """Количество открытых соединений"""
+        with self._cond:
+            return len(self._pool)
+    
+    def close(self):
+        """Закрытие всех соединений (ждет завершения текущих запросов)"""
+        with self._cond:
+            while self._busy or self._pending:
+                self._cond.wait()
+            for conn in self._pool.values():
+                conn.close()
+            self._pool.clear()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def branch_monthly_stats(self, branch, start_date, end_date):
+        """Статистика одного филиала за период"""
+        conn = self._acquire(branch)
+        try:
+            return fetch_monthly_stats(conn, start_date, end_date)
+        finally:
+            self._release(branch)
+    
+    def _safe_branch_stats(self, branch, start_date, end_date):
+        """Статистика филиала; ошибка возвращается вместо исключения"""
+        with self._cond:
+            known = branch in self.branches
+        if not known:
+            return [], "неизвестный филиал"
+        
+        try:
+            return self.branch_monthly_stats(branch, start_date, end_date), None
+        except sqlite3.Error as error:
+            return [], f"ошибка чтения базы ({error})"
+    
+    def consolidated_monthly_stats(self, year=None, month=None, branches=None):
+        """Сводная статистика за месяц по всем филиалам.
+        
+        Возвращает (stats, failed): строки всех филиалов и список
+        (филиал, ошибка) для филиалов, которые не удалось прочитать.
+        """
+        if not year:
+            year = date.today().year
+        if not month:
+            month = date.today().month
+        if branches is None:
+            with self._cond:
+                branches = list(self.branches)
+        else:
+            branches = list(branches)
+        
+        start_date, end_date = month_bounds(year, month)
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(
+                lambda branch: self._safe_branch_stats(branch, start_date, end_date),
+                branches
+            ))
+        
+        stats = []
+        failed = []
+        for branch, (branch_stats, error) in zip(branches, results):
+            if error is not None:
+                failed.append((branch, error))
+                continue
+            stats.extend((branch,) + tuple(stat) for stat in branch_stats)
+        
+        stats.sort(key=lambda stat: stat[3] or 0, reverse=True)
+        
+        print(f"\n📈 СВОДНАЯ СТАТИСТИКА ЗА {month:02d}.{year} (филиалов: {len(branches)})")
+        print("="*90)
+        print(f"{'Филиал':<20} {'Сотрудник':<25} {'Раб.дней':<10} {'Всего часов':<12} {'Ср.часов/день':<15}")
+        print("-"*90)
+        
+        total_hours = 0
+        for stat in stats:
+            avg_hours = stat[4] if stat[4] else 0
+            print(f"{stat[0]:<20} {stat[1]:<25} {stat[2]:<10} {stat[3] or 0:<12.1f} {avg_hours:<15.1f}")
+            total_hours += stat[3] or 0
+        
+        print("-"*90)
+        print(f"Всего отработано часов: {total_hours:.1f}")
+        print(f"Количество сотрудников: {len(stats)}")
+        
+        for branch, error in failed:
+            print(f"❌ Филиал {branch}: {error}")
+        
+        return stats, failed
+
 def main():
     system = AdminAttendanceSystem()
     
@@ -0,0 +1,90 @@
+# bench_branches.py
+import sqlite3
+import os
+import io
+import sys
+import time
+import random
+import tempfile
+import contextlib
+from datetime import date, timedelta
+
+from app import AdminAttendanceSystem, BranchRouter, fetch_monthly_stats, month_bounds
+
+def create_branch_db(db_name, employees=20, year=2024, month=1):
+    """Создание тестовой базы филиала"""
+    AdminAttendanceSystem(db_name)
+    
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    
+    for i in range(employees):
+        cursor.execute('''
+            INSERT INTO employees (username, password, full_name, position)
+            VALUES (?, ?, ?, ?)
+        ''', (f'user{i}', 'pass', f'Сотрудник {i}', 'Инженер'))
+        employee_id = cursor.lastrowid
+        
+        work_date = date(year, month, 1)
+        while work_date.month == month:
+            hours = random.uniform(6, 10)
+            cursor.execute('''
+                INSERT INTO attendance (employee_id, work_date, time_in, time_out, hours_worked, status)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (employee_id, work_date, '09:00', '18:00', hours, 'Present'))
+            work_date += timedelta(days=1)
+    
+    conn.commit()
+    conn.close()
+
+def bench_sequential(paths, start_date, end_date):
+    """Открытие и запрос по каждому файлу подряд (без записи в базы)"""
+    start = time.perf_counter()
+    for path in paths:
+        conn = sqlite3.connect(path)
+        fetch_monthly_stats(conn, start_date, end_date)
+        conn.close()
+    return time.perf_counter() - start
+
+def bench_router(paths, year, month, max_open, max_workers, repeats=1, warm=False):
+    """Сводный отчет через BranchRouter; warm - замер на уже заполненном пуле"""
+    branches = {os.path.basename(path): path for path in paths}
+    with BranchRouter(branches, max_open=max_open, max_workers=max_workers) as router:
+        if warm:
+            with contextlib.redirect_stdout(io.StringIO()):
+                router.consolidated_monthly_stats(year, month)
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(repeats):
+                router.consolidated_monthly_stats(year, month)
+        elapsed = time.perf_counter() - start
+        assert router.open_connections() <= max_open
+    return elapsed / repeats
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or [50, 100, 200, 400]
+    year, month, max_open, workers = 2024, 1, 32, 8
+    start_date, end_date = month_bounds(year, month)
+    random.seed(0)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        print(f"Время отчета, с (max_open={max_open})")
+        print(f"{'Филиалов':<10} {'Подряд':<10} {'Пул, 1 поток':<14} {f'Пул, {workers} потоков':<18} "
+              f"{'Повтор, пул на все филиалы':<26}")
+        print("-"*80)
+        
+        for size in sizes:
+            while len(paths) < size:
+                path = os.path.join(tmp, f'branch_{len(paths):04d}.db')
+                create_branch_db(path, year=year, month=month)
+                paths.append(path)
+            
+            sequential = bench_sequential(paths[:size], start_date, end_date)
+            single = bench_router(paths[:size], year, month, max_open, 1)
+            threaded = bench_router(paths[:size], year, month, max_open, workers)
+            warm = bench_router(paths[:size], year, month, size, workers, repeats=5, warm=True)
+            print(f"{size:<10} {sequential:<10.3f} {single:<14.3f} {threaded:<18.3f} {warm:<26.3f}")
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
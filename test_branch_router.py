@@ -0,0 +1,155 @@
+# test_branch_router.py
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+import contextlib
+
+from app import AdminAttendanceSystem, BranchRouter
+
+def create_branch_db(db_name, full_name):
+    """База филиала с одним сотрудником и одним рабочим днем"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        system = AdminAttendanceSystem(db_name)
+        system.add_employee('user', 'pass', full_name, 'Инженер')
+        system.manual_time_entry(2, '2024-01-10', '09:00', '17:00')
+
+class ConnectionProxy:
+    """Обертка соединения для подсчета открытых файлов"""
+    def __init__(self, conn, router):
+        self.conn = conn
+        self.router = router
+    
+    def cursor(self):
+        return self.conn.cursor()
+    
+    def close(self):
+        self.conn.close()
+        with self.router.counter_lock:
+            self.router.live -= 1
+
+class CountingRouter(BranchRouter):
+    """Роутер, который считает реально открытые соединения"""
+    def __init__(self, *args, open_delay=0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.open_delay = open_delay
+        self.counter_lock = threading.Lock()
+        self.live = 0
+        self.max_live = 0
+    
+    def _open(self, db_name):
+        conn = super()._open(db_name)
+        with self.counter_lock:
+            self.live += 1
+            self.max_live = max(self.max_live, self.live)
+        time.sleep(self.open_delay)
+        return ConnectionProxy(conn, self)
+
+class BranchRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.branches = {}
+        for name in ['A', 'B', 'C', 'D']:
+            path = os.path.join(self.tmp.name, f'{name}.db')
+            create_branch_db(path, f'Сотрудник {name}')
+            self.branches[name] = path
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def touch(self, router, branch):
+        router._acquire(branch)
+        router._release(branch)
+    
+    def test_lru_eviction_order(self):
+        router = BranchRouter(self.branches, max_open=2)
+        for branch in ['A', 'B', 'A', 'C']:
+            self.touch(router, branch)
+        
+        self.assertEqual(list(router._pool), ['A', 'C'])
+        router.close()
+    
+    def test_bound_under_contention(self):
+        router = CountingRouter(self.branches, max_open=2, max_workers=8, open_delay=0.01)
+        with contextlib.redirect_stdout(io.StringIO()):
+            for _ in range(5):
+                stats, failed = router.consolidated_monthly_stats(2024, 1, list(self.branches) * 3)
+        
+        self.assertEqual(failed, [])
+        self.assertEqual(len(stats), 12)
+        self.assertLessEqual(router.max_live, 2)
+        self.assertLessEqual(router.open_connections(), 2)
+        router.close()
+        self.assertEqual(router.live, 0)
+    
+    def test_failed_open_while_victim_reacquired(self):
+        opening = threading.Event()
+        resume = threading.Event()
+        
+        class BlockingRouter(CountingRouter):
+            def _open(self, db_name):
+                if db_name.endswith('missing.db'):
+                    opening.set()
+                    resume.wait()
+                    raise sqlite3.OperationalError("unable to open database file")
+                return super()._open(db_name)
+        
+        branches = dict(self.branches, X=os.path.join(self.tmp.name, 'missing.db'))
+        router = BlockingRouter(branches, max_open=2)
+        self.touch(router, 'A')
+        self.touch(router, 'B')
+        
+        errors = []
+        def acquire_missing():
+            try:
+                router._acquire('X')
+            except sqlite3.Error as error:
+                errors.append(error)
+        
+        worker = threading.Thread(target=acquire_missing)
+        worker.start()
+        opening.wait()
+        
+        # A уже вытеснен ради X; берем его заново, пока X открывается
+        conn = router._acquire('A')
+        router._release('A')
+        resume.set()
+        worker.join()
+        
+        self.assertEqual(len(errors), 1)
+        self.assertIs(router._pool['A'], conn)
+        self.assertLessEqual(router.max_live, 2)
+        router.close()
+        self.assertEqual(router.live, 0)
+        self.assertEqual(router._busy, set())
+    
+    def test_failed_branches_reported(self):
+        branches = dict(self.branches, missing=os.path.join(self.tmp.name, 'missing.db'))
+        router = BranchRouter(branches, max_open=2)
+        
+        with contextlib.redirect_stdout(io.StringIO()) as out:
+            stats, failed = router.consolidated_monthly_stats(
+                2024, 1, iter(['A', 'missing', 'B', 'ghost']))
+        router.close()
+        
+        self.assertEqual(sorted(stat[0] for stat in stats), ['A', 'B'])
+        self.assertEqual([branch for branch, error in failed], ['missing', 'ghost'])
+        self.assertIn("❌ Филиал missing", out.getvalue())
+        self.assertIn("❌ Филиал ghost", out.getvalue())
+    
+    def test_add_branch_replaces_pooled_connection(self):
+        router = BranchRouter(self.branches, max_open=2)
+        self.touch(router, 'A')
+        router.add_branch('A', self.branches['B'])
+        
+        with contextlib.redirect_stdout(io.StringIO()):
+            stats, failed = router.consolidated_monthly_stats(2024, 1, ['A'])
+        router.close()
+        
+        self.assertEqual(stats[0][1], 'Сотрудник B')
+
+if __name__ == "__main__":
+    unittest.main()
\ No newline at end of file